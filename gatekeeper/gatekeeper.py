@@ -13,14 +13,22 @@ Raises:
     Displays error messages for unreachable hosts or failed WoL attempts
 """
 
-from os import chmod, getenv
-from requests import Response, post
-from socket import create_connection, timeout as socket_timeout
-from streamlit import  button, error, expander, file_uploader, info, markdown, set_page_config, success, text_input, title
-from subprocess import run, CalledProcessError
-from tempfile import gettempdir, NamedTemporaryFile
+from asyncio import create_subprocess_exec, gather, new_event_loop, run_coroutine_threadsafe, to_thread, wait_for
+from asyncio.subprocess import DEVNULL
+from asyncssh import Error as SSHError, connect as ssh_connect, import_private_key
+from errno import EINPROGRESS, EISCONN, EWOULDBLOCK
+from functools import lru_cache
+from httpx import AsyncClient, AsyncHTTPTransport, ConnectError, HTTPError, Limits, Response, TimeoutException
+from ipaddress import ip_address
+from os import getenv
+from re import fullmatch
+from selectors import DefaultSelector, EVENT_WRITE
+from socket import AF_INET, AF_INET6, AF_UNSPEC, IPPROTO_TCP, SOCK_DGRAM, SOCK_STREAM, SOL_SOCKET, SO_BROADCAST, SO_ERROR, SO_LINGER, SO_REUSEADDR, TCP_NODELAY, getaddrinfo, socket
+from streamlit import  button, cache_data, cache_resource, error, fragment, info, markdown, set_page_config, sidebar, success, title
+from struct import pack
+from threading import Thread
+from time import monotonic, sleep
 from urllib.parse import urljoin
-from wakeonlan import send_magic_packet
 
 # Load environment variables
 IS_PROXMOX: bool = getenv("IS_PROXMOX").strip().lower() in {"true"}
@@ -28,29 +36,289 @@ SERVER_IP: str = getenv("SERVER_IP")
 SERVER_MAC: str = getenv("SERVER_MAC")
 SERVER_PORT: int = int(getenv("SERVER_PORT"))
 
-def is_server_up(ip: str, port: int, timeout: float = 2.0) -> bool:
+# Validate configuration at import so bad values fail at boot rather than at first click
+try:
+    _IP_BYTES: bytes = ip_address(SERVER_IP).packed
+except ValueError as ex:
+    raise RuntimeError(f"SERVER_IP is not a valid IP address: {SERVER_IP!r}") from ex
+
+if SERVER_MAC is None or not fullmatch(r"[0-9A-Fa-f:-]{12,17}", SERVER_MAC):
+    raise RuntimeError(f"SERVER_MAC is not a valid MAC address: {SERVER_MAC!r}")
+try:
+    _MAC_BYTES: bytes = bytes.fromhex(SERVER_MAC.replace(":", "").replace("-", ""))
+except ValueError as ex:
+    raise RuntimeError(f"SERVER_MAC is not a valid MAC address: {SERVER_MAC!r}") from ex
+if len(_MAC_BYTES) != 6:
+    raise RuntimeError(f"SERVER_MAC is not a valid MAC address: {SERVER_MAC!r}")
+
+# Wake-on-LAN magic packet for the configured server, precomputed once
+_MAGIC_PACKET: bytes = b"\xff" * 6 + _MAC_BYTES * 16
+
+# Reused broadcast socket for Wake-on-LAN packets
+_WOL_SOCKET = socket(AF_INET, SOCK_DGRAM)
+_WOL_SOCKET.setsockopt(SOL_SOCKET, SO_BROADCAST, 1)
+
+@lru_cache(maxsize=None)
+def _resolve(ip: str, port: int) -> tuple:
     """
-    Check if the server is reachable on a specific TCP port.
+    Resolve the probe target to a socket family and address, once.
+
+    A literal IP address skips the resolver entirely; anything else goes through
+    getaddrinfo a single time and the result is cached, so repeated probes on
+    Streamlit reruns do not re-enter the resolver stack.
 
     Parameters:
-        ip (str): IP address of the server to be checked.
-        port (int): TCP port number for server web UI.
-        timeout (float, optional): Timeout in seconds for the connection attempt. Default is 2.0 seconds.
+        ip (str): IP address or hostname of the host to be probed.
+        port (int): TCP port number to probe.
+
+    Returns:
+        tuple: The (family, sockaddr) pair to build and connect the socket with.
+
+    Raises:
+        socket.gaierror: Raised if the hostname cannot be resolved.
+    """
+
+    try:
+        parsed = ip_address(ip)
+    except ValueError:
+        family, _, _, _, sockaddr = getaddrinfo(ip, port, AF_UNSPEC, SOCK_STREAM)[0]
+        return family, sockaddr
+    return (AF_INET6 if parsed.version == 6 else AF_INET), (ip, port)
+
+def _probe(ip: str, port: int, timeout: float) -> bool:
+    """
+    Attempt a non-blocking TCP connection to the given address.
+
+    The socket is put into non-blocking mode so the attempt returns as soon as the
+    connection succeeds or is refused, instead of always paying the blocking-connect
+    scheduling overhead. The timeout is a single deadline covering the whole socket
+    lifecycle, and SO_LINGER forces a reset on close so no graceful FIN wait or
+    TIME_WAIT state can outlive it.
+
+    Parameters:
+        ip (str): IP address of the host to be probed.
+        port (int): TCP port number to probe.
+        timeout (float): Deadline in seconds for the whole connection attempt.
 
     Returns:
         bool: True if the host is reachable on the given port, False otherwise.
 
     Raises:
         OSError: Raised internally by the socket library if an unexpected I/O error occurs.
-        ConnectionRefusedError: Raised if the port is closed or access is denied.
-        socket.timeout: Raised if the connection attempt exceeds the specified timeout.
     """
 
+    deadline = monotonic() + timeout
+    try:
+        family, sockaddr = _resolve(ip, port)
+    except OSError:
+        return False
+    probe_socket = socket(family, SOCK_STREAM)
+    probe_socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+    probe_socket.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+    probe_socket.setsockopt(SOL_SOCKET, SO_LINGER, pack("ii", 1, 0))
+    probe_socket.setblocking(False)
     try:
-        with create_connection((ip, port), timeout=timeout):
+        error_code = probe_socket.connect_ex(sockaddr)
+        if error_code in (0, EISCONN):
             return True
-    except (socket_timeout, ConnectionRefusedError, OSError):
+        if error_code not in (EINPROGRESS, EWOULDBLOCK):
+            return False
+        with DefaultSelector() as selector:
+            selector.register(probe_socket, EVENT_WRITE)
+            if not selector.select(max(deadline - monotonic(), 0.0)):
+                return False
+        return probe_socket.getsockopt(SOL_SOCKET, SO_ERROR) == 0
+    except OSError:
         return False
+    finally:
+        probe_socket.close()
+
+async def _icmp_probe(ip: str, timeout: float = 1.0) -> bool:
+    """
+    Check if the host answers an ICMP echo request.
+
+    Parameters:
+        ip (str): IP address of the host to be pinged.
+        timeout (float, optional): Timeout in seconds for the ping. Default is 1.0 second.
+
+    Returns:
+        bool: True if the host replied within the timeout, False otherwise.
+    """
+
+    try:
+        ping = await create_subprocess_exec("ping", "-c", "1", "-W", str(max(int(timeout), 1)), ip,
+                                            stdout=DEVNULL, stderr=DEVNULL)
+    except OSError:
+        return False
+    try:
+        return await wait_for(ping.wait(), timeout) == 0
+    except TimeoutError:
+        ping.kill()
+        await ping.wait()
+        return False
+
+async def _probes(ip: str, port: int, timeout: float) -> bool:
+    """
+    Run the TCP probe and the ICMP probe concurrently.
+
+    Fanning the probes out means an unreachable host is detected after the longest
+    single timeout rather than the sum of both.
+
+    Parameters:
+        ip (str): IP address of the host to be probed.
+        port (int): TCP port number to probe.
+        timeout (float): Timeout in seconds for the TCP connection attempt.
+
+    Returns:
+        bool: True if any probe reached the host, False otherwise.
+    """
+
+    results = await gather(to_thread(_probe, ip, port, timeout), _icmp_probe(ip, min(timeout, 1.0)),
+                           return_exceptions=True)
+    return any(result is True for result in results)
+
+class _AsyncRunner:
+    """
+    Run coroutines on a single long-lived event loop hosted by a daemon thread.
+
+    Streamlit executes the script on worker threads with no running event loop;
+    spinning a fresh loop up per call pays loop start-up on every rerun and tears
+    down any connection state bound to it. A shared loop lets probes and API calls
+    run concurrently while pooled clients survive across reruns.
+    """
+
+    def __init__(self):
+        self.loop = new_event_loop()
+        Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def run(self, coroutine):
+        """
+        Execute a coroutine on the shared loop and block until its result is available.
+
+        Parameters:
+            coroutine: The coroutine to execute.
+
+        Returns:
+            The value returned by the coroutine.
+        """
+
+        return run_coroutine_threadsafe(coroutine, self.loop).result()
+
+@cache_resource(show_spinner=False)
+def _get_runner() -> _AsyncRunner:
+    """
+    Return the shared event loop runner, creating it on first use.
+
+    Parameters:
+        None
+
+    Returns:
+        _AsyncRunner: The cached runner hosting the application's event loop.
+    """
+
+    return _AsyncRunner()
+
+@cache_resource(show_spinner=False)
+def _get_client() -> AsyncClient:
+    """
+    Build the pooled HTTP/2 client used for Proxmox API calls.
+
+    The client is cached as a resource and bound to the shared event loop, so
+    repeated shutdown attempts and follow-up polls multiplex over one kept-alive
+    TLS session instead of renegotiating per request.
+
+    Parameters:
+        None
+
+    Returns:
+        AsyncClient: An httpx client with HTTP/2, keep-alive pooling and connect retries configured.
+    """
+
+    transport = AsyncHTTPTransport(http2=True, verify=False, retries=2,
+                                   limits=Limits(max_keepalive_connections=2))
+    return AsyncClient(timeout=5.0, transport=transport)
+
+def is_server_up(ip: str, port: int, timeout: float = 1.0) -> bool:
+    """
+    Check if the server is reachable via a concurrent TCP and ICMP probe.
+
+    Parameters:
+        ip (str): IP address of the server to be checked.
+        port (int): TCP port number for server web UI.
+        timeout (float, optional): Timeout in seconds for the connection attempt. Default is 1.0 second.
+
+    Returns:
+        bool: True if any probe reached the host, False otherwise.
+    """
+
+    return _get_runner().run(_probes(ip, port, timeout))
+
+class _Monitor:
+    """
+    Poll the server in the background and keep the latest status in memory.
+
+    A daemon thread re-probes on a fixed interval so page renders only read the
+    cached result, making render latency independent of the network round trip.
+    The probe timeout is a settable attribute rather than part of the monitor's
+    identity, so changing it retunes the existing poller instead of spawning a
+    new one.
+    """
+
+    def __init__(self, ip: str, port: int, timeout: float = 1.0, interval: float = 3.0):
+        self._ip = ip
+        self._port = port
+        self.timeout = timeout
+        self._interval = interval
+        self.status: dict = {}
+        self.refresh()
+        Thread(target=self._poll, daemon=True).start()
+
+    def refresh(self) -> None:
+        """
+        Probe the server immediately and update the cached status.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        self.status["up"] = is_server_up(self._ip, self._port, self.timeout)
+        self.status["checked_at"] = monotonic()
+
+    def _poll(self) -> None:
+        """
+        Re-probe the server forever on the configured interval.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+
+        while True:
+            sleep(self._interval)
+            self.refresh()
+
+@cache_resource(show_spinner=False)
+def _get_monitor(ip: str, port: int) -> _Monitor:
+    """
+    Return the background status monitor for the given target, creating it on first use.
+
+    The monitor is keyed on the target alone; the probe timeout is adjusted on the
+    existing instance so there is exactly one poller thread per target.
+
+    Parameters:
+        ip (str): IP address of the server to monitor.
+        port (int): TCP port number for server web UI.
+
+    Returns:
+        _Monitor: The cached monitor polling the target.
+    """
+
+    return _Monitor(ip, port)
 
 def render_header():
     """
@@ -82,6 +350,9 @@ def render_generic_shutdown_ui(ip: str, port: int):
         Displays error messages in UI on failure.
     """
 
+    # Deferred import: only the reachable-server path needs these widgets
+    from streamlit import expander, file_uploader
+
     with expander("Shut Down Server"):
         markdown("Upload your **private SSH key** to perform a shutdown.")
 
@@ -89,16 +360,10 @@ def render_generic_shutdown_ui(ip: str, port: int):
         ssh_user: str = "gatekeeper"
 
         if ssh_key_file and button("Send Shutdown Command"):
-            temp_dir = gettempdir()
-            with NamedTemporaryFile(mode="w", dir=temp_dir, prefix="ssh_key_", delete=True) as temp_key_file:
-                temp_key_file.write(ssh_key_file.getvalue().decode("utf-8"))
-                temp_key_file.flush()
-                chmod(temp_key_file.name, 0o600) # chmod u=rw,go= (read/write for user only)
-
-                if shutdown_linux_with_ssh(ip, ssh_user, temp_key_file.name):
-                    success("Shutdown command sent successfully!")
-                else:
-                    error("Shutdown failed. Verify that the SSH setup is correctly configured.")
+            if shutdown_linux_with_ssh(ip, ssh_user, ssh_key_file.getvalue()):
+                success("Shutdown command sent successfully!")
+            else:
+                error("Shutdown failed. Verify that the SSH setup is correctly configured.")
 
 def render_proxmox_shutdown_ui(ip: str, port: int):
     """
@@ -115,6 +380,9 @@ def render_proxmox_shutdown_ui(ip: str, port: int):
         Displays error messages in UI on failure.
     """
 
+    # Deferred import: only the reachable-server path needs these widgets
+    from streamlit import expander, text_input
+
     with expander("Shut Down Proxmox"):
         markdown("Enter your **Proxmox API token credentials** to perform a shutdown.")
 
@@ -128,14 +396,46 @@ def render_proxmox_shutdown_ui(ip: str, port: int):
             else:
                 error("Shutdown request failed. Check credentials and try again.")
 
-def shutdown_linux_with_ssh(server_ip: str, username: str, key_path: str) -> bool:
+# Shutdown UI for the configured deployment, bound once at import
+_render_shutdown = render_proxmox_shutdown_ui if IS_PROXMOX else render_generic_shutdown_ui
+
+async def _run_remote_shutdown(server_ip: str, username: str, key_data: bytes) -> tuple:
+    """
+    Connect over SSH and issue the shutdown command.
+
+    The private key is imported directly from the uploaded bytes, so it never
+    touches disk and no temporary file or permission fix-up is needed.
+
+    Parameters:
+        server_ip (str): IP address of the server to shut down.
+        username (str): The SSH username (should be 'gatekeeper').
+        key_data (bytes): Contents of the SSH private key.
+
+    Returns:
+        tuple: The (exit_status, stderr) pair of the remote command.
+
+    Raises:
+        asyncssh.Error: Raised if the key is invalid or authentication or the SSH session fails.
+        OSError: Raised if the host is unreachable.
+    """
+
+    client_key = import_private_key(key_data)
+    async with ssh_connect(server_ip, username=username, client_keys=[client_key],
+                           known_hosts=None, connect_timeout=5) as connection:
+        result = await connection.run("sudo shutdown now", check=False, timeout=5)
+        return result.exit_status, result.stderr or ""
+
+def shutdown_linux_with_ssh(server_ip: str, username: str, key_data: bytes) -> bool:
     """
     Perform a shutdown of the server via SSH using a restricted key.
 
+    The SSH session runs in-process on the shared event loop instead of forking the
+    OpenSSH binary, avoiding process spawn and key re-parsing on every attempt.
+
     Parameters:
         server_ip (str): IP address of the server to shut down.
         username (str): The SSH username (should be 'gatekeeper').
-        key_path (str): Path to the SSH private key.
+        key_data (bytes): Contents of the SSH private key.
 
     Returns:
         bool: True if the shutdown command succeeds, False otherwise.
@@ -144,35 +444,48 @@ def shutdown_linux_with_ssh(server_ip: str, username: str, key_path: str) -> boo
         Displays UI error messages for SSH execution issues.
     """
 
-    ssh_command = [
-        "ssh",
-        "-i", key_path,
-        "-o", "StrictHostKeyChecking=no",
-        "-o", "UserKnownHostsFile=/dev/null",
-        f"{username}@{server_ip}",
-        "sudo shutdown now"
-    ]
-
     try:
-        result = run(ssh_command, capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            return True
-        else:
-            error(f"SSH error ({result.returncode}): {result.stderr.strip()}")
-            return False
-    except FileNotFoundError:
-        error("SSH command not found. Ensure OpenSSH is installed on your system.")
-        return False
-    except CalledProcessError as e:
-        error(f"SSH command failed: {e}")
+        exit_status, stderr = _get_runner().run(_run_remote_shutdown(server_ip, username, key_data))
+    except SSHError as ex:
+        error(f"SSH error: {ex}")
         return False
-    except socket_timeout:
+    except (OSError, TimeoutError):
         error("Connection timed out.")
         return False
     except Exception as ex:
         error(f"Unexpected error: {ex}")
         return False
 
+    if exit_status == 0:
+        return True
+    error(f"SSH command failed ({exit_status}): {stderr.strip()}")
+    return False
+
+@cache_data(show_spinner=False)
+def _build_shutdown_request(server_ip: str, server_port: int, node_name: str, token_id: str, token_secret: str) -> tuple:
+    """
+    Assemble the Proxmox shutdown URL, headers and body for a set of credentials.
+
+    The assembled request is constant for a given credential set, so it is cached
+    and Streamlit reruns skip the URL joining and header formatting.
+
+    Parameters:
+        server_ip (str): IP address of the Proxmox host.
+        server_port (int): TCP port for Proxmox API.
+        node_name (str): The name of the Proxmox node.
+        token_id (str): Token identifier in the form `user@realm!tokenname`.
+        token_secret (str): Token secret string.
+
+    Returns:
+        tuple: The (url, headers, data) triple for the shutdown POST.
+    """
+
+    url_base = f"https://{server_ip}:{server_port}/api2/json/"
+    shutdown_url = urljoin(url_base, f"nodes/{node_name}/status")
+    headers = {"Authorization": f"PVEAPIToken={token_id}={token_secret}"}
+    data = {"command": "shutdown"}
+    return shutdown_url, headers, data
+
 def shutdown_proxmox_with_token(server_ip: str, server_port: int, node_name: str, token_id: str, token_secret: str) -> bool:
     """
     Send a shutdown request to the Proxmox host using the API token.
@@ -191,57 +504,84 @@ def shutdown_proxmox_with_token(server_ip: str, server_port: int, node_name: str
         Displays UI error messages for API call failures.
     """
 
-    url_base = f"https://{server_ip}:{server_port}/api2/json/"
-    shutdown_url = urljoin(url_base, f"nodes/{node_name}/status")
-    headers = {"Authorization": f"PVEAPIToken={token_id}={token_secret}"}
-    data = {"command": "shutdown"}
+    shutdown_url, headers, data = _build_shutdown_request(server_ip, server_port, node_name, token_id, token_secret)
 
     try:
-        response: Response = post(shutdown_url, headers=headers, data=data, verify=False, timeout=5)
-        if response.status_code == 200:
-            return True
-        else:
-            error(f"Shutdown failed: {response.status_code} - {response.text}")
-            return False
-    except Exception as ex:
+        response: Response = _get_runner().run(_get_client().post(shutdown_url, headers=headers, data=data))
+    except TimeoutException:
+        error("Proxmox API request timed out.")
+        return False
+    except ConnectError:
+        error(f"Could not connect to Proxmox at {server_ip}:{server_port}.")
+        return False
+    except HTTPError as ex:
         error(f"Error contacting Proxmox API: {ex}")
         return False
+
+    if response.status_code == 200:
+        return True
+    error(f"Shutdown failed: {response.status_code} - {response.text[:200]}")
+    return False
     
-def wake_server(mac: str) -> None:
+def wake_server() -> None:
     """
-    Send a Wake-on-LAN (WoL) magic packet to the server.
+    Send a Wake-on-LAN (WoL) magic packet to the configured server.
+
+    The MAC address is validated and the packet precomputed at import, so each
+    click is a single sendto over the reused broadcast socket.
 
     Parameters:
-        mac (str): The MAC address of the server system to wake.
+        None
+
     Returns:
         None
 
     Raises:
-        ValueError: If the MAC address is invalid.
-        RuntimeError: If sending the WoL packet fails due to an internal socket error.
+        OSError: If sending the WoL packet fails due to an internal socket error.
     """
 
-    send_magic_packet(mac)
+    _WOL_SOCKET.sendto(_MAGIC_PACKET, ("255.255.255.255", 9))
 
-def main():
-    render_header()
+@fragment(run_every=5)
+def status_panel(timeout: float):
+    """
+    Render the status banner and its action controls as a self-refreshing fragment.
+
+    The fragment re-runs on its own 5 second schedule and on interactions with its
+    widgets, so button clicks re-render only this subtree instead of the whole script.
+
+    Parameters:
+        timeout (float): Timeout in seconds for each probe.
 
-    if is_server_up(SERVER_IP, SERVER_PORT):
+    Returns:
+        None
+    """
+
+    monitor = _get_monitor(SERVER_IP, SERVER_PORT)
+    monitor.timeout = timeout
+
+    if button("Refresh Status"):
+        monitor.refresh()
+
+    if monitor.status["up"]:
         success(f"Server is up at {SERVER_IP}:{SERVER_PORT}")
-        if IS_PROXMOX:
-            render_proxmox_shutdown_ui(SERVER_IP, SERVER_PORT)
-        else:
-           render_generic_shutdown_ui(SERVER_IP, SERVER_PORT)
+        _render_shutdown(SERVER_IP, SERVER_PORT)
     else:
         error(f"Server is currently **unavailable** at {SERVER_IP}:{SERVER_PORT}")
         if button("Wake Server"):
             try:
-                wake_server(SERVER_MAC)
+                wake_server()
                 success("Wake-on-LAN signal sent successfully!")
             except Exception as e:
                 error(f"Failed to send WoL packet: {e}")
 
-        info("Refresh the page to recheck server status.")
+        info("Status rechecks automatically; use **Refresh Status** to recheck immediately.")
+
+def main():
+    render_header()
+
+    timeout: float = sidebar.slider("Probe timeout (seconds)", min_value=0.5, max_value=5.0, value=1.0, step=0.5)
+    status_panel(timeout)
 
 
 if __name__ == "__main__":